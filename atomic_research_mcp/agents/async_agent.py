@@ -0,0 +1,51 @@
+"""Async agent base for the Deep Research MCP server."""
+
+from typing import AsyncIterator, Optional
+
+from pydantic import BaseModel
+from atomic_agents.agents.base_agent import BaseIOSchema, BaseAgent
+
+
+class AsyncBaseAgent(BaseAgent):
+    """
+    Agent whose client is an async instructor client, so responses can be awaited on the event loop.
+
+    Agents are shared by concurrent pipeline runs, so `arun` and `arun_stream` treat every call as a
+    fresh conversation: they start from the initial memory and never modify `self.memory`.
+    The synchronous `run` inherited from BaseAgent does not work with an async client.
+    """
+
+    def _build_messages(self, user_input: Optional[BaseIOSchema] = None) -> list[dict]:
+        """Builds the messages for a single call without reading or writing the shared memory."""
+        memory = self.initial_memory.copy()
+        if user_input:
+            memory.initialize_turn()
+            memory.add_message("user", user_input)
+
+        return [
+            {
+                "role": "system",
+                "content": self.system_prompt_generator.generate_prompt(),
+            }
+        ] + memory.get_history()
+
+    async def arun(self, user_input: Optional[BaseIOSchema] = None) -> BaseIOSchema:
+        """Runs the agent with the given user input asynchronously."""
+        return await self.client.chat.completions.create(
+            messages=self._build_messages(user_input),
+            model=self.model,
+            response_model=self.output_schema,
+            **self.model_api_parameters,
+        )
+
+    async def arun_stream(self, user_input: Optional[BaseIOSchema] = None) -> AsyncIterator[BaseModel]:
+        """Runs the agent with the given user input asynchronously, yielding partial responses."""
+        response_stream = self.client.chat.completions.create_partial(
+            messages=self._build_messages(user_input),
+            model=self.model,
+            response_model=self.output_schema,
+            **self.model_api_parameters,
+            stream=True,
+        )
+        async for partial_response in response_stream:
+            yield partial_response
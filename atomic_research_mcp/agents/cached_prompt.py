@@ -0,0 +1,23 @@
+"""Cached system prompt generation for the Deep Research MCP server."""
+
+from typing import Optional
+
+from atomic_agents.lib.components.system_prompt_generator import SystemPromptGenerator
+
+
+class CachedSystemPromptGenerator(SystemPromptGenerator):
+    """
+    System prompt generator that renders a static prompt only once.
+
+    A static prompt renders to the same string every time, so this only skips re-rendering it on each call.
+    Prompts with context providers are dynamic and are rendered on every call as usual.
+    """
+
+    _cached_prompt: Optional[str] = None
+
+    def generate_prompt(self) -> str:
+        if self.context_providers:
+            return super().generate_prompt()
+        if self._cached_prompt is None:
+            self._cached_prompt = super().generate_prompt()
+        return self._cached_prompt
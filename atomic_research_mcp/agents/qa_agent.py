@@ -1,13 +1,13 @@
 """Question answering agent for the Deep Research MCP server."""
 
 import instructor
-import openai
 from pydantic import Field
-from atomic_agents.agents.base_agent import BaseIOSchema, BaseAgent, BaseAgentConfig
-from atomic_agents.lib.components.system_prompt_generator import SystemPromptGenerator
+from atomic_agents.agents.base_agent import BaseIOSchema, BaseAgentConfig
 
 from atomic_research_mcp.tools.webpage_scraper import WebpageScraperToolOutputSchema
 
+from .async_agent import AsyncBaseAgent
+from .cached_prompt import CachedSystemPromptGenerator
 from ..config import ChatConfig
 
 
@@ -28,13 +28,13 @@ class QuestionAnsweringAgentOutputSchema(BaseIOSchema):
     answer: str = Field(..., description="The answer to the question.")
 
 
-def create_qa_agent() -> BaseAgent:
+def create_qa_agent() -> AsyncBaseAgent:
     """Creates and configures a new question answering agent."""
-    return BaseAgent(
+    return AsyncBaseAgent(
         BaseAgentConfig(
-            client=instructor.from_openai(openai.OpenAI(api_key=ChatConfig.api_key)),
+            client=instructor.from_openai(ChatConfig.async_openai_client()),
             model=ChatConfig.model,
-            system_prompt_generator=SystemPromptGenerator(
+            system_prompt_generator=CachedSystemPromptGenerator(
                 background=[
                     "You are an expert research assistant focused on providing accurate, well-sourced information.",
                     "Your answers should be based on the provided web content and include relevant source citations.",
@@ -1,12 +1,12 @@
 """Query generation agent for the Deep Research MCP server."""
 
 import instructor
-import openai
 from pydantic import Field
-from atomic_agents.agents.base_agent import BaseIOSchema, BaseAgent, BaseAgentConfig
-from atomic_agents.lib.components.system_prompt_generator import SystemPromptGenerator
+from atomic_agents.agents.base_agent import BaseIOSchema, BaseAgentConfig
 
 from ..tools.tavily_search import TavilySearchToolInputSchema
+from .async_agent import AsyncBaseAgent
+from .cached_prompt import CachedSystemPromptGenerator
 from ..config import ChatConfig
 
 
@@ -22,13 +22,13 @@ class QueryAgentInputSchema(BaseIOSchema):
     )
 
 
-def create_query_agent() -> BaseAgent:
+def create_query_agent() -> AsyncBaseAgent:
     """Creates and configures a new query generation agent."""
-    return BaseAgent(
+    return AsyncBaseAgent(
         BaseAgentConfig(
-            client=instructor.from_openai(openai.OpenAI(api_key=ChatConfig.api_key)),
+            client=instructor.from_openai(ChatConfig.async_openai_client()),
             model=ChatConfig.model,
-            system_prompt_generator=SystemPromptGenerator(
+            system_prompt_generator=CachedSystemPromptGenerator(
                 background=[
                     "You are an expert search engine query generator with a deep understanding of which queries will maximize relevant results."
                 ],
@@ -1,6 +1,10 @@
 """Configuration settings for the Deep Research MCP server."""
 
 import os
+import threading
+from typing import Optional
+
+import openai
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -15,8 +19,56 @@ class ChatConfig:
     # Default model to use
     model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
+    # Embedding model used for the semantic cache
+    embedding_model = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+
+    # OpenAI clients shared by all callers, created on first use
+    _openai_client: Optional[openai.OpenAI] = None
+    _async_openai_client: Optional[openai.AsyncOpenAI] = None
+    _client_lock = threading.Lock()
+
+    @classmethod
+    def openai_client(cls) -> openai.OpenAI:
+        """Return the shared OpenAI client so all calls reuse one connection pool."""
+        with cls._client_lock:
+            if cls._openai_client is None:
+                cls._openai_client = openai.OpenAI(api_key=cls.api_key)
+        return cls._openai_client
+
+    @classmethod
+    def async_openai_client(cls) -> openai.AsyncOpenAI:
+        """Return the shared async OpenAI client used by the agents."""
+        with cls._client_lock:
+            if cls._async_openai_client is None:
+                cls._async_openai_client = openai.AsyncOpenAI(api_key=cls.api_key)
+        return cls._async_openai_client
+
     @classmethod
     def validate(cls):
         """Validate that required configuration is present."""
         if not cls.api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
+
+
+class CacheConfig:
+    """Configuration settings for the semantic response cache."""
+
+    # SQLite database the cache is persisted to, in the per-user cache directory by default.
+    # Set to ":memory:" to keep the cache in memory only.
+    db_path = os.getenv(
+        "SEMANTIC_CACHE_PATH",
+        os.path.join(
+            os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+            "atomic-research-mcp",
+            "semantic_cache.db",
+        ),
+    )
+
+    # Minimum cosine similarity between two questions for a cache hit
+    similarity_threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+
+    # Time in seconds a cached result is served before it expires
+    ttl = float(os.getenv("SEMANTIC_CACHE_TTL", str(24 * 60 * 60)))
+
+    # Maximum number of cached results, the oldest are evicted first
+    max_entries = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
@@ -0,0 +1,45 @@
+"""Relevance-based trimming of scraped context for the Deep Research MCP server."""
+
+import itertools
+
+import numpy as np
+
+from .embeddings import embed_texts
+from .tools.webpage_scraper import WebpageScraperToolOutputSchema
+
+# Longer chunks are cut off for embedding only. Dense non-English text or code can take more than one token
+# per character, so this stays within the embedding model's 8192 token input limit at up to four per character.
+MAX_EMBEDDED_CHUNK_CHARS = 2048
+
+
+def split_chunks(content: str) -> list[str]:
+    """Splits markdown content into paragraph chunks."""
+    return [chunk for chunk in content.rstrip("\n").split("\n\n") if chunk.strip()]
+
+
+def trim_pages(
+    pages: list[WebpageScraperToolOutputSchema], question_embedding: np.ndarray, max_chunks: int = 20
+) -> list[WebpageScraperToolOutputSchema]:
+    """
+    Keeps the chunks of each scraped page that are most similar to the question, in their original order.
+
+    The chunks of all pages are embedded in a single batch. Trimmed pages are copies, so pages shared
+    through the scraper cache are left untouched.
+    """
+    page_chunks = [split_chunks(page.content) for page in pages]
+    pages_to_trim = [i for i, chunks in enumerate(page_chunks) if len(chunks) > max_chunks]
+    if not pages_to_trim:
+        return pages
+
+    all_chunks = itertools.chain.from_iterable(page_chunks[i] for i in pages_to_trim)
+    similarities = embed_texts([chunk[:MAX_EMBEDDED_CHUNK_CHARS] for chunk in all_chunks]) @ question_embedding
+
+    trimmed_pages = list(pages)
+    offset = 0
+    for i in pages_to_trim:
+        chunks = page_chunks[i]
+        page_similarities = similarities[offset:offset + len(chunks)]
+        offset += len(chunks)
+        keep = np.sort(np.argpartition(-page_similarities, max_chunks)[:max_chunks])
+        trimmed_pages[i] = pages[i].model_copy(update={"content": "\n\n".join(chunks[j] for j in keep) + "\n"})
+    return trimmed_pages
@@ -0,0 +1,49 @@
+"""Text embedding helpers for the Deep Research MCP server."""
+
+import functools
+from typing import Iterator
+
+import numpy as np
+
+from .config import ChatConfig
+
+
+# Number of texts sent per embeddings request, the API accepts at most 2048
+EMBEDDING_BATCH_SIZE = 512
+# Total characters sent per embeddings request, which keeps a request within the API's limit of 300k tokens
+# even at four tokens per character
+EMBEDDING_BATCH_MAX_CHARS = 75_000
+
+
+def _batches(texts: list[str], batch_size: int, batch_max_chars: int) -> Iterator[list[str]]:
+    """Splits texts into consecutive batches bounded by both their number and their total length."""
+    batch, batch_chars = [], 0
+    for text in texts:
+        if batch and (len(batch) == batch_size or batch_chars + len(text) > batch_max_chars):
+            yield batch
+            batch, batch_chars = [], 0
+        batch.append(text)
+        batch_chars += len(text)
+    if batch:
+        yield batch
+
+
+def embed_texts(
+    texts: list[str], batch_size: int = EMBEDDING_BATCH_SIZE, batch_max_chars: int = EMBEDDING_BATCH_MAX_CHARS
+) -> np.ndarray:
+    """Embeds the given texts in as few requests as possible and returns one L2-normalized row per text."""
+    embeddings = []
+    for batch in _batches(texts, batch_size, batch_max_chars):
+        response = ChatConfig.openai_client().embeddings.create(model=ChatConfig.embedding_model, input=batch)
+        embeddings.extend(item.embedding for item in response.data)
+    vectors = np.array(embeddings, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@functools.lru_cache(maxsize=4096)
+def embed_text(text: str) -> np.ndarray:
+    """Embeds a single text, memoizing the result so exact repeats skip the API call."""
+    embedding = embed_texts([text])[0]
+    # The cached array is shared between callers, so guard it against in-place changes
+    embedding.flags.writeable = False
+    return embedding
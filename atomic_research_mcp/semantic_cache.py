@@ -0,0 +1,140 @@
+"""Semantic response cache for the Deep Research MCP server."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Caches pipeline results keyed on the embedding of the question.
+
+    A lookup returns the cached result of the most similar previous question if its cosine
+    similarity is at least the configured threshold and it was asked with the same parameters
+    (for example the number of search queries). Entries expire after `ttl`
+    seconds and at most `max_entries` are kept, the oldest being evicted first.
+
+    Entries are persisted to SQLite so the cache survives restarts; only live entries created
+    with the current embedding model are loaded. Pass ":memory:" as `db_path` to disable persistence,
+    or a `max_entries` of 0 to disable the cache.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        embedding_model: str,
+        similarity_threshold: float = 0.92,
+        ttl: float = 24 * 60 * 60,
+        max_entries: int = 1000,
+    ):
+        self.embedding_model = embedding_model
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._embeddings: Optional[np.ndarray] = None
+
+        # Without room for entries the cache is disabled: lookups miss and nothing is stored
+        self.enabled = max_entries > 0
+        if not self.enabled:
+            return
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS semantic_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                embedding_model TEXT NOT NULL,
+                cache_key TEXT NOT NULL,
+                question TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("DELETE FROM semantic_cache WHERE created_at < ?", (time.time() - ttl,))
+        self._conn.commit()
+
+        # Entries live in fixed-size slots that are reused oldest first, so adding never copies the matrix
+        self._created_at = np.full(max_entries, -np.inf)
+        self._cache_keys: list[Optional[str]] = [None] * max_entries
+        self._results: list[Optional[dict]] = [None] * max_entries
+        self._row_ids: list[Optional[int]] = [None] * max_entries
+        self._next_slot = 0
+
+        rows = self._conn.execute(
+            """
+            SELECT id, cache_key, embedding, result, created_at FROM semantic_cache
+            WHERE embedding_model = ? ORDER BY id DESC LIMIT ?
+            """,
+            (embedding_model, max_entries),
+        ).fetchall()
+        if len(rows) == max_entries:
+            # Drop older entries that no longer fit in the cache
+            self._conn.execute(
+                "DELETE FROM semantic_cache WHERE embedding_model = ? AND id < ?", (embedding_model, rows[-1][0])
+            )
+            self._conn.commit()
+        for row_id, cache_key, embedding, result, created_at in reversed(rows):
+            self._store_slot(row_id, cache_key, np.frombuffer(embedding, dtype=np.float32), json.loads(result), created_at)
+
+    @staticmethod
+    def make_key(**params) -> str:
+        """Builds the key that a cached result must match in addition to the question similarity."""
+        return json.dumps(params, sort_keys=True)
+
+    def _store_slot(
+        self, row_id: int, cache_key: str, embedding: np.ndarray, result: dict, created_at: float
+    ) -> Optional[int]:
+        """Stores an entry in the next slot and returns the row id of the entry it replaced, if any."""
+        if self._embeddings is None:
+            self._embeddings = np.zeros((self.max_entries, embedding.shape[0]), dtype=np.float32)
+        slot = self._next_slot
+        replaced_row_id = self._row_ids[slot]
+        self._embeddings[slot] = embedding
+        self._created_at[slot] = created_at
+        self._cache_keys[slot] = cache_key
+        self._results[slot] = result
+        self._row_ids[slot] = row_id
+        self._next_slot = (slot + 1) % self.max_entries
+        return replaced_row_id
+
+    def lookup(self, embedding: np.ndarray, cache_key: str) -> Optional[dict]:
+        """Returns the cached result for the most similar live question with the same key, or None on a miss."""
+        with self._lock:
+            if self._embeddings is None:
+                return None
+            similarities = self._embeddings @ embedding
+            similarities[self._created_at < time.time() - self.ttl] = -np.inf
+            similarities[[key != cache_key for key in self._cache_keys]] = -np.inf
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.similarity_threshold:
+                return self._results[best]
+            return None
+
+    def add(self, question: str, embedding: np.ndarray, result: dict, cache_key: str) -> None:
+        """Stores a pipeline result under the embedding of its question, evicting the oldest entry when full."""
+        if not self.enabled:
+            return
+        embedding = np.asarray(embedding, dtype=np.float32)
+        created_at = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                INSERT INTO semantic_cache (embedding_model, cache_key, question, embedding, result, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (self.embedding_model, cache_key, question, embedding.tobytes(), json.dumps(result), created_at),
+            )
+            replaced_row_id = self._store_slot(cursor.lastrowid, cache_key, embedding, result, created_at)
+            if replaced_row_id is not None:
+                self._conn.execute("DELETE FROM semantic_cache WHERE id = ?", (replaced_row_id,))
+            self._conn.commit()
@@ -1,12 +1,23 @@
+import asyncio
 import logging
 import os
-import json
 import traceback
-from mcp.server.fastmcp import FastMCP
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import orjson
+from mcp.server.fastmcp import Context, FastMCP
 
 # Import required components for the web search pipeline
+from atomic_research_mcp.config import ChatConfig, CacheConfig
+from atomic_research_mcp.context_trimmer import trim_pages
+from atomic_research_mcp.embeddings import embed_text
+from atomic_research_mcp.semantic_cache import SemanticCache
 from atomic_research_mcp.agents.query_agent import create_query_agent, QueryAgentInputSchema
-from atomic_research_mcp.agents.qa_agent import create_qa_agent, QuestionAnsweringAgentInputSchema
+from atomic_research_mcp.agents.qa_agent import (
+    create_qa_agent,
+    QuestionAnsweringAgentInputSchema,
+    QuestionAnsweringAgentOutputSchema
+)
 from atomic_research_mcp.tools.tavily_search import (
     TavilySearchTool,
     TavilySearchToolConfig,
@@ -14,7 +25,8 @@ from atomic_research_mcp.tools.tavily_search import (
 )
 from atomic_research_mcp.tools.webpage_scraper import (
     WebpageScraperTool,
-    WebpageScraperToolInputSchema
+    WebpageScraperToolInputSchema,
+    WebpageSkippedError
 )
 
 # Set up logging to show INFO level messages
@@ -25,61 +37,125 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def create_semantic_cache() -> SemanticCache:
+    """Creates the semantic cache, falling back to an in-memory cache if the database cannot be opened."""
+    cache_settings = dict(
+        embedding_model=ChatConfig.embedding_model,
+        similarity_threshold=CacheConfig.similarity_threshold,
+        ttl=CacheConfig.ttl,
+        max_entries=CacheConfig.max_entries
+    )
+    if CacheConfig.max_entries <= 0:
+        logger.info("Semantic cache disabled, SEMANTIC_CACHE_MAX_ENTRIES is not positive")
+    try:
+        return SemanticCache(db_path=CacheConfig.db_path, **cache_settings)
+    except Exception as e:
+        logger.warning(f"Could not open semantic cache at {CacheConfig.db_path}, keeping it in memory: {str(e)}")
+        return SemanticCache(db_path=":memory:", **cache_settings)
+
+
+def create_scraper_tool() -> WebpageScraperTool:
+    """Creates the web scraper tool with its parsing worker processes already started."""
+    scraper_tool = WebpageScraperTool()
+    scraper_tool.warm_up()
+    return scraper_tool
+
+
 def main():
     # Create a new MCP server with the identifier "tutorial"
     mcp = FastMCP("research_pipeline")
     logger.info("Starting research pipeline server...")
 
     try:
-        # Initialize the components
-        logger.info("Initializing query agent...")
-        query_agent = create_query_agent()
-
-        logger.info("Initializing QA agent...")
-        qa_agent = create_qa_agent()
-
-        # Initialize Tavily search tool with API key from environment
+        # Tavily search tool needs an API key from environment
         tavily_api_key = os.getenv("TAVILY_API_KEY", "")
         if not tavily_api_key:
             logger.error("TAVILY_API_KEY environment variable is not set. Web search will not work properly.")
             raise ValueError("TAVILY_API_KEY environment variable must be set")
 
-        logger.info("Initializing Tavily search tool...")
-        tavily_tool = TavilySearchTool(
-            config=TavilySearchToolConfig(
-                api_key=tavily_api_key,
-                max_results=5,  # Limiting to top 5 results per query
-                include_answer=True
-            )
-        )
+        # Initialize the components in parallel, they are independent of each other
+        logger.info("Initializing components...")
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = {
+                executor.submit(create_query_agent): "query agent",
+                executor.submit(create_qa_agent): "QA agent",
+                executor.submit(
+                    TavilySearchTool,
+                    config=TavilySearchToolConfig(
+                        api_key=tavily_api_key,
+                        max_results=5,  # Limiting to top 5 results per query
+                        include_answer=True
+                    )
+                ): "Tavily search tool",
+                executor.submit(create_scraper_tool): "web scraper tool",
+                executor.submit(create_semantic_cache): "semantic cache",
+            }
+            components = {}
+            for future in as_completed(futures):
+                components[futures[future]] = future.result()
+                logger.info(f"Initialized {futures[future]}")
 
-        logger.info("Initializing web scraper tool...")
-        scraper_tool = WebpageScraperTool()
+        query_agent = components["query agent"]
+        qa_agent = components["QA agent"]
+        tavily_tool = components["Tavily search tool"]
+        scraper_tool = components["web scraper tool"]
+        semantic_cache = components["semantic cache"]
 
         @mcp.tool(
             name="web_search_pipeline",
-            description="Performs a web search pipeline: generates queries, searches web, sorts results, scrapes pages, and answers questions."
+            description=(
+                "Performs a web search pipeline: generates queries, searches web, sorts results, scrapes pages, "
+                "and answers questions. args: instruction (str), question (str, defaults to instruction), "
+                "num_queries (int, default 3), max_chunks_per_page (int, default 20), "
+                "min_context_pages (int, optional; by default all top results are scraped before answering, "
+                "set it to start answering once that many pages are scraped), "
+                "scrape_grace_period (float seconds, default 2; extra time the remaining scrapes get once "
+                "min_context_pages pages are in, before they are cancelled)."
+            )
         )
-        async def web_search_pipeline(args: dict) -> str:
+        async def web_search_pipeline(args: dict, ctx: Context) -> str:
             # Extract the instruction and question
             instruction = args.get("instruction", "")
             question = args.get("question", instruction)  # Use instruction as question if not provided
             num_queries = args.get("num_queries", 3)
+            min_context_pages = args.get("min_context_pages")  # Defaults to waiting for every top result
+            scrape_grace_period = args.get("scrape_grace_period", 2.0)
+            max_chunks_per_page = args.get("max_chunks_per_page", 20)
 
             logger.info(f"Starting web search pipeline for question: {question}")
 
             try:
+                # Return the cached result if a sufficiently similar question was answered before with the
+                # same parameters. The cache is an optimization, so the pipeline runs uncached if it fails.
+                # The key only holds the non-text parameters, the question text is matched by similarity.
+                question_embedding = None
+                cache_key = SemanticCache.make_key(
+                    num_queries=num_queries,
+                    min_context_pages=min_context_pages,
+                    scrape_grace_period=scrape_grace_period,
+                    max_chunks_per_page=max_chunks_per_page,
+                )
+                try:
+                    question_embedding = await asyncio.to_thread(embed_text, question)
+                    cached_result = semantic_cache.lookup(question_embedding, cache_key)
+                except Exception as e:
+                    logger.warning(f"Semantic cache lookup failed, continuing without cache: {str(e)}")
+                    cached_result = None
+                if cached_result is not None:
+                    logger.info("Semantic cache hit, returning cached result")
+                    return orjson.dumps({**cached_result, "question": question}).decode()
+
                 # Step 1: Generate search queries using query agent
                 logger.info(f"Step 1: Generating {num_queries} search queries...")
                 query_input = QueryAgentInputSchema(instruction=instruction, num_queries=num_queries)
-                query_result = query_agent.run(query_input)
+                query_result = await query_agent.arun(query_input)
                 queries = query_result.queries
                 logger.info(f"Generated queries: {queries}")
 
                 # Step 2: Perform web search using Tavily
                 logger.info(f"Step 2: Performing web search with {len(queries)} queries...")
                 search_input = TavilySearchToolInputSchema(queries=queries)
-                search_results = tavily_tool.run(search_input)
+                search_results = await tavily_tool.run_async(search_input)
                 logger.info(f"Received {len(search_results.results)} search results")
 
                 # Step 3: Sort results by score in descending order
@@ -87,26 +163,75 @@ def main():
                 sorted_results = sorted(search_results.results, key=lambda x: x.score, reverse=True)
                 logger.info(f"Top result score: {sorted_results[0].score if sorted_results else 'No results'}")
 
-                # Step 4: Take top results and scrape their content
+                # Step 4: Take top results and scrape their content concurrently
                 top_results = sorted_results[:5]  # Limit to top 5 results
-                scraped_pages = []
                 logger.info(f"Step 4: Scraping content from top {len(top_results)} results...")
+                scrape_semaphore = asyncio.Semaphore(scraper_tool.config.max_concurrency)
+
+                async def scrape(i, result):
+                    async with scrape_semaphore:
+                        try:
+                            logger.info(f"Scraping {i+1}/{len(top_results)}: {result.url}")
+                            scrape_input = WebpageScraperToolInputSchema(url=result.url)
+                            scrape_result = await scraper_tool.run_async(scrape_input)
+                            logger.info(f"Successfully scraped {result.url}")
+                            return scrape_result
+                        except WebpageSkippedError as e:
+                            logger.info(f"Skipping {result.url}: {str(e)}")
+                            return None
+                        except Exception as e:
+                            logger.error(f"Error scraping {result.url}: {str(e)}")
+                            logger.error(traceback.format_exc())
+                            return None
+
+                # When fewer pages are required, give the remaining scrapes a grace period once enough pages
+                # are in instead of waiting on the slowest page
+                scrape_tasks = [asyncio.create_task(scrape(i, result)) for i, result in enumerate(top_results)]
+                required_pages = len(top_results) if min_context_pages is None else min_context_pages
+                pages_ready = 0
+                for next_page in asyncio.as_completed(scrape_tasks):
+                    if await next_page is not None:
+                        pages_ready += 1
+                        if pages_ready >= required_pages:
+                            break
+
+                pending_tasks = [task for task in scrape_tasks if not task.done()]
+                if pending_tasks:
+                    _, pending_tasks = await asyncio.wait(pending_tasks, timeout=scrape_grace_period)
+                for task in pending_tasks:
+                    task.cancel()
+                if pending_tasks:
+                    logger.info(f"Cancelled {len(pending_tasks)} scrapes still pending after the grace period")
+
+                # Keep the scraped pages in search score order
+                scraped_pages = [
+                    task.result() for task in scrape_tasks
+                    if task.done() and not task.cancelled() and task.result() is not None
+                ]
 
-                for i, result in enumerate(top_results):
+                # Keep only the parts of each page that are relevant to the question
+                if question_embedding is not None:
                     try:
-                        logger.info(f"Scraping {i+1}/{len(top_results)}: {result.url}")
-                        scrape_input = WebpageScraperToolInputSchema(url=result.url)
-                        scrape_result = scraper_tool.run(scrape_input)
-                        scraped_pages.append(scrape_result)
-                        logger.info(f"Successfully scraped {result.url}")
+                        scraped_pages = await asyncio.to_thread(
+                            trim_pages, scraped_pages, question_embedding, max_chunks_per_page
+                        )
                     except Exception as e:
-                        logger.error(f"Error scraping {result.url}: {str(e)}")
-                        logger.error(traceback.format_exc())
+                        logger.warning(f"Error trimming scraped context, using full pages: {str(e)}")
 
                 # Step 5: Generate answer using QA agent
                 logger.info("Step 5: Generating answer using QA agent...")
                 qa_input = QuestionAnsweringAgentInputSchema(question=question, context=scraped_pages)
-                qa_result = qa_agent.run(qa_input)
+
+                # Stream the answer and forward each new chunk to the client as a log notification,
+                # the complete answer is still part of the returned result
+                partial_result = None
+                streamed_answer = ""
+                async for partial_result in qa_agent.arun_stream(qa_input):
+                    answer = partial_result.answer or ""
+                    if len(answer) > len(streamed_answer):
+                        await ctx.info(answer[len(streamed_answer):], logger_name="web_search_pipeline.answer")
+                        streamed_answer = answer
+                qa_result = QuestionAnsweringAgentOutputSchema(**partial_result.model_dump())
                 logger.info("Answer generated successfully")
 
                 # Return comprehensive result as JSON string
@@ -124,8 +249,13 @@ def main():
                     "references": qa_result.references if hasattr(qa_result, 'references') else [],
                     "followup_questions": qa_result.followup_questions if hasattr(qa_result, 'followup_questions') else []
                 }
+                if question_embedding is not None:
+                    try:
+                        await asyncio.to_thread(semantic_cache.add, question, question_embedding, result, cache_key)
+                    except Exception as e:
+                        logger.warning(f"Error storing result in semantic cache: {str(e)}")
                 logger.info("Pipeline completed successfully")
-                return json.dumps(result)  # Return JSON string
+                return orjson.dumps(result).decode()  # Return JSON string
 
             except Exception as e:
                 logger.error(f"Error in pipeline execution: {str(e)}")
@@ -136,11 +266,21 @@ def main():
                     "stage": "pipeline execution",
                     "traceback": traceback.format_exc()
                 }
-                return json.dumps(error_response)  # Return error as JSON string
+                return orjson.dumps(error_response).decode()  # Return error as JSON string
+
+        async def serve():
+            # The pooled HTTP client is bound to the server's event loop, so close it there before it stops
+            try:
+                await mcp.run_stdio_async()
+            finally:
+                await scraper_tool.aclose()
 
         logger.info("All components initialized successfully. Starting server...")
         # Start the server
-        mcp.run()
+        try:
+            asyncio.run(serve())
+        finally:
+            scraper_tool.shutdown()
 
     except Exception as e:
         logger.error(f"Error during server initialization: {str(e)}")
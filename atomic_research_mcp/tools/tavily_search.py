@@ -55,6 +55,7 @@ class TavilySearchToolConfig(BaseToolConfig):
     include_domains: Optional[List[str]] = []
     include_answer: Optional[bool] = False
     include_raw_content: Optional[bool] = False
+    max_concurrency: Optional[int] = 3
 
 
 class TavilySearchTool(BaseTool):
@@ -70,6 +71,7 @@ class TavilySearchTool(BaseTool):
         include_domains (List[str]): A list of domains to pull results from.
         include_answer (bool): Include the answer in the respones from Tavily.
         include_raw_content (bool): Include the raw content of the search results.
+        max_concurrency (int): The maximum number of queries sent to Tavily at the same time.
     """
 
     input_schema = TavilySearchToolInputSchema
@@ -92,8 +94,11 @@ class TavilySearchTool(BaseTool):
         self.include_domains = config.include_domains
         self.include_answer = config.include_answer
         self.include_raw_content = config.include_raw_content
+        self.max_concurrency = config.max_concurrency
 
-    async def _fetch_search_results(self, session: aiohttp.ClientSession, query: str) -> List[dict]:
+    async def _fetch_search_results(
+        self, session: aiohttp.ClientSession, query: str, semaphore: asyncio.Semaphore
+    ) -> List[dict]:
         headers = {
             "accept": "/",
             "content-type": "application/json",
@@ -114,7 +119,7 @@ class TavilySearchTool(BaseTool):
             "max_results": self.max_results,
         }
 
-        async with session.post("https://api.tavily.com/search", headers=headers, json=json_data) as response:
+        async with semaphore, session.post("https://api.tavily.com/search", headers=headers, json=json_data) as response:
             if response.status != 200:
                 error_message = await response.text()
                 raise Exception(
@@ -135,9 +140,11 @@ class TavilySearchTool(BaseTool):
     async def run_async(
         self, params: TavilySearchToolInputSchema, max_results: Optional[int] = None
     ) -> TavilySearchToolOutputSchema:
+        # Bound the number of in-flight requests to stay under Tavily's rate limit
+        semaphore = asyncio.Semaphore(self.max_concurrency or len(params.queries) or 1)
         async with aiohttp.ClientSession() as session:
-            # Fetch results for all queries
-            tasks = [self._fetch_search_results(session, query) for query in params.queries]
+            # Fetch results for all queries concurrently
+            tasks = [self._fetch_search_results(session, query, semaphore) for query in params.queries]
             raw_results = await asyncio.gather(*tasks)
 
         # Process results for each query
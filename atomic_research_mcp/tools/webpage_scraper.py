@@ -1,8 +1,16 @@
+import asyncio
+import html
+import multiprocessing
 import re
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple, Optional
 from urllib.parse import urlparse
 
-import requests
+import httpx
 from bs4 import BeautifulSoup
 from markdownify import markdownify
 from pydantic import Field, HttpUrl
@@ -11,6 +19,30 @@ from readability import Document
 from atomic_agents.agents.base_agent import BaseIOSchema
 from atomic_agents.lib.base.base_tool import BaseTool, BaseToolConfig
 
+_CONTENT_RE = re.compile(r"content|main", re.I)
+_BLANK_LINES_RE = re.compile(r"\n\s*\n\s*\n")
+_TRAILING_WHITESPACE_RE = re.compile(r"[^\S\n]+(?=\n|$)")
+# Tokens scanned at the start of a page to find the meta description: comments, scripts and styles are
+# matched as a whole so their contents are skipped, and quoted attribute values may contain ">"
+_HEAD_TOKEN_RE = re.compile(
+    r"""<!--.*?-->|<script\b.*?</script\s*>|<style\b.*?</style\s*>|(?P<head_end></head\s*>)"""
+    r"""|(?P<meta><meta\b(?:[^>"']|"[^"]*"|'[^']*')*>)""",
+    re.I | re.S,
+)
+_TAG_ATTR_RE = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+
+
+class WebpageSkippedError(Exception):
+    """Raised when a webpage is not scraped because its content is not HTML or is too large."""
+
+
+class FetchedWebpage(NamedTuple):
+    """A fetched webpage with its body already decompressed and decoded."""
+
+    status_code: int
+    headers: httpx.Headers
+    text: str
+
 
 class WebpageScraperToolInputSchema(BaseIOSchema):
     """Schema for webpage scraper input."""
@@ -48,6 +80,34 @@ class WebpageScraperToolConfig(BaseToolConfig):
         default=30,
         description="Timeout in seconds for HTTP requests.",
     )
+    max_concurrency: int = Field(
+        default=5,
+        description="Maximum number of webpages to scrape concurrently.",
+    )
+    cache_ttl: int = Field(
+        default=3600,
+        description="Time in seconds a scraped webpage is served from cache before it is revalidated.",
+    )
+    cache_max_entries: int = Field(
+        default=256,
+        description="Maximum number of scraped webpages kept in cache.",
+    )
+    max_content_bytes: int = Field(
+        default=5 * 1024 * 1024,
+        description="Maximum size in bytes of a webpage that will be downloaded.",
+    )
+    max_html_chars: int = Field(
+        default=512 * 1024,
+        description="Maximum number of characters of main content HTML converted to markdown, longer content is truncated.",
+    )
+    max_parse_workers: int = Field(
+        default=4,
+        description="Number of worker processes used to parse webpages in parallel.",
+    )
+    max_connections: int = Field(
+        default=32,
+        description="Maximum number of pooled HTTP connections.",
+    )
 
 
 class WebpageScraperTool(BaseTool):
@@ -59,50 +119,165 @@ class WebpageScraperTool(BaseTool):
     def __init__(self, config: WebpageScraperToolConfig = WebpageScraperToolConfig()):
         super().__init__(config)
         self.config = config
+        self._cache: OrderedDict[str, dict] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._client = self._create_client()
+        # Parsing is CPU-bound and holds the GIL, so it runs in worker processes to use multiple cores
+        self._process_pool = self._create_process_pool()
+        self._process_pool_lock = threading.Lock()
+
+    def _create_process_pool(self) -> ProcessPoolExecutor:
+        """Creates the pool of worker processes that parse webpages."""
+        return ProcessPoolExecutor(
+            max_workers=self.config.max_parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def _replace_broken_process_pool(self, broken_pool: ProcessPoolExecutor) -> None:
+        """Replaces a pool whose worker died, unless a concurrent scrape already did so."""
+        with self._process_pool_lock:
+            if self._process_pool is broken_pool:
+                self._process_pool = self._create_process_pool()
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self) -> None:
+        """
+        Starts the worker processes and imports the parsing dependencies in them.
+
+        Workers are spawned lazily, so without this the first scrapes pay for process startup.
+        """
+        futures = [self._process_pool.submit(_warm_up_worker) for _ in range(self.config.max_parse_workers)]
+        for future in futures:
+            future.result()
+
+    async def aclose(self) -> None:
+        """Closes the pooled HTTP connections, must be awaited on the event loop `run_async` was used on."""
+        await self._client.aclose()
+
+    def shutdown(self) -> None:
+        """Stops the worker processes."""
+        self._process_pool.shutdown(cancel_futures=True)
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """Creates an HTTP/2-capable client whose connection pool is reused across scrapes."""
+        return httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=self.config.timeout,
+            limits=httpx.Limits(max_connections=self.config.max_connections),
+            headers={
+                "User-Agent": self.config.user_agent,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.5",
+            },
+        )
+
+    def _get_cached(self, url: str) -> Optional[dict]:
+        """Returns the cache entry for a URL, if any."""
+        with self._cache_lock:
+            entry = self._cache.get(url)
+            if entry is not None:
+                self._cache.move_to_end(url)
+            return entry
+
+    def _store_cached(
+        self, url: str, output: WebpageScraperToolOutputSchema, etag: Optional[str]
+    ) -> None:
+        """Stores a scraped webpage in the cache, evicting the least recently used entries."""
+        with self._cache_lock:
+            self._cache[url] = {"timestamp": time.time(), "etag": etag, "output": output}
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.config.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    async def _fetch_webpage(
+        self, client: httpx.AsyncClient, url: str, etag: Optional[str] = None
+    ) -> FetchedWebpage:
+        """Fetches webpage content, revalidating against the given ETag if provided."""
+        headers = {"If-None-Match": etag} if etag else None
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304:
+                return FetchedWebpage(304, response.headers, "")
+
+            # Bail out before downloading the body of PDFs, images and other non-HTML content
+            content_type = response.headers.get("Content-Type", "")
+            if content_type and "html" not in content_type.lower():
+                raise WebpageSkippedError(f"Unsupported content type '{content_type}' for {url}")
+
+            content_length = response.headers.get("Content-Length", "")
+            if content_length.isdigit() and int(content_length) > self.config.max_content_bytes:
+                raise WebpageSkippedError(f"Content length {content_length} exceeds the limit for {url}")
+
+            # aiter_bytes yields decompressed bytes, so the body is decoded here rather than handed to a new
+            # Response that would apply the Content-Encoding a second time
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > self.config.max_content_bytes:
+                    raise WebpageSkippedError(f"Content exceeds {self.config.max_content_bytes} bytes for {url}")
 
-    def _fetch_webpage(self, url: str) -> str:
-        """Fetches webpage content."""
-        headers = {
-            "User-Agent": self.config.user_agent,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-        }
-        response = requests.get(url, headers=headers, timeout=self.config.timeout)
-        return response.text
+            text = bytes(body).decode(response.encoding or "utf-8", errors="replace")
+            return FetchedWebpage(response.status_code, response.headers, text)
 
+    @staticmethod
     def _extract_metadata(
-        self, soup: BeautifulSoup, doc: Document, url: str
+        soup: BeautifulSoup, html_content: str, url: str
     ) -> WebpageMetadata:
         """Extracts metadata from the webpage."""
         domain = urlparse(url).netloc
-        description = None
+        description = WebpageScraperTool._extract_description(soup, html_content)
 
-        description_tag = soup.find("meta", attrs={"name": "description"})
-        if description_tag:
-            description = description_tag.get("content")
+        # Only fall back to readability, which re-parses the whole page, if there is no usable <title>
+        title_tag = soup.find("title")
+        title = title_tag.get_text(" ", strip=True) if title_tag else ""
+        if not title:
+            title = Document(html_content).title()
 
-        return WebpageMetadata(
-            title=doc.title(),
+        return WebpageMetadata.model_construct(
+            title=title,
             domain=domain,
             description=description,
         )
 
-    def _clean_markdown(self, markdown: str) -> str:
+    @staticmethod
+    def _extract_description(soup: BeautifulSoup, html_content: str) -> Optional[str]:
+        """
+        Extracts the meta description from the raw <head>.
+
+        Only pages without a closing </head> tag fall back to looking the description up in the soup.
+        """
+        for token in _HEAD_TOKEN_RE.finditer(html_content):
+            if token.group("head_end"):
+                return None
+            if token.group("meta"):
+                attrs = {
+                    name.lower(): html.unescape(double or single or bare)
+                    for name, double, single, bare in _TAG_ATTR_RE.findall(token.group("meta"))
+                }
+                if attrs.get("name", "").lower() == "description":
+                    return attrs.get("content")
+
+        description_tag = soup.find("meta", attrs={"name": "description"})
+        return description_tag.get("content") if description_tag else None
+
+    @staticmethod
+    def _clean_markdown(markdown: str) -> str:
         """Cleans up markdown content."""
-        markdown = re.sub(r"\n\s*\n\s*\n", "\n\n", markdown)
-        markdown = "\n".join(line.rstrip() for line in markdown.splitlines())
+        markdown = _BLANK_LINES_RE.sub("\n\n", markdown)
+        markdown = _TRAILING_WHITESPACE_RE.sub("", markdown)
         markdown = markdown.strip() + "\n"
         return markdown
 
-    def _extract_main_content(self, soup: BeautifulSoup) -> str:
+    @staticmethod
+    def _extract_main_content(soup: BeautifulSoup) -> str:
         """Extracts main content from webpage."""
         for element in soup.find_all(["script", "style", "nav", "header", "footer"]):
             element.decompose()
 
         content_candidates = [
             soup.find("main"),
-            soup.find(id=re.compile(r"content|main", re.I)),
-            soup.find(class_=re.compile(r"content|main", re.I)),
+            soup.find(id=_CONTENT_RE),
+            soup.find(class_=_CONTENT_RE),
             soup.find("article"),
         ]
 
@@ -112,25 +287,98 @@ class WebpageScraperTool(BaseTool):
 
         return str(main_content) if main_content else str(soup)
 
-    def run(
-        self, params: WebpageScraperToolInputSchema
+    async def _parse_in_process_pool(self, html_content: str, url: str) -> tuple[str, str, Optional[str], str]:
+        """
+        Parses a webpage in the process pool, replacing the pool if a worker died.
+
+        The page is retried once in a fresh pool. It is never parsed in this process, as a page that
+        crashes a worker would take the server down with it.
+        """
+        for attempt in range(2):
+            pool = self._process_pool
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    pool, _parse_html_to_markdown, html_content, url, self.config.max_html_chars
+                )
+            except BrokenProcessPool:
+                self._replace_broken_process_pool(pool)
+                if attempt:
+                    raise
+
+    async def _scrape(
+        self, client: httpx.AsyncClient, params: WebpageScraperToolInputSchema
     ) -> WebpageScraperToolOutputSchema:
-        """Runs the webpage scraper tool."""
-        html_content = self._fetch_webpage(str(params.url))
-        soup = BeautifulSoup(html_content, "html.parser")
-        doc = Document(html_content)
-
-        main_content = self._extract_main_content(soup)
-        markdown_content = markdownify(
-            main_content,
-            strip=["script", "style"],
-            heading_style="ATX",
-            bullets="-",
-        )
-        markdown_content = self._clean_markdown(markdown_content)
-        metadata = self._extract_metadata(soup, doc, str(params.url))
+        """Scrapes a webpage with the given client, serving it from cache when possible."""
+        url = str(params.url)
+        cached = self._get_cached(url)
+        if cached and time.time() - cached["timestamp"] < self.config.cache_ttl:
+            return cached["output"]
+
+        response = await self._fetch_webpage(client, url, etag=cached["etag"] if cached else None)
+        if cached and response.status_code == 304:
+            self._store_cached(url, cached["output"], cached["etag"])
+            return cached["output"]
 
-        return WebpageScraperToolOutputSchema(
+        markdown_content, title, description, domain = await self._parse_in_process_pool(response.text, url)
+        # Skip validation, every field is a string produced by the scraper itself
+        output = WebpageScraperToolOutputSchema.model_construct(
             content=markdown_content,
-            metadata=metadata,
+            metadata=WebpageMetadata.model_construct(title=title, domain=domain, description=description),
         )
+        # Error pages such as rate limit responses are returned once but never served from cache
+        is_success = 200 <= response.status_code < 300
+        if is_success and "no-store" not in response.headers.get("Cache-Control", ""):
+            self._store_cached(url, output, response.headers.get("ETag"))
+        return output
+
+    async def run_async(
+        self, params: WebpageScraperToolInputSchema
+    ) -> WebpageScraperToolOutputSchema:
+        """Runs the webpage scraper tool using the shared connection pool."""
+        return await self._scrape(self._client, params)
+
+    def run(
+        self, params: WebpageScraperToolInputSchema
+    ) -> WebpageScraperToolOutputSchema:
+        """
+        Runs the webpage scraper tool synchronously.
+
+        The shared client is bound to the event loop it is used on, so this creates a
+        short-lived client on a separate thread's event loop instead.
+        """
+        async def scrape_with_own_client():
+            async with self._create_client() as client:
+                return await self._scrape(client, params)
+
+        with ThreadPoolExecutor() as executor:
+            return executor.submit(asyncio.run, scrape_with_own_client()).result()
+
+
+def _warm_up_worker() -> None:
+    """Does nothing; running it makes a worker process start and import this module."""
+
+
+def _parse_html_to_markdown(
+    html_content: str, url: str, max_html_chars: int
+) -> tuple[str, str, Optional[str], str]:
+    """
+    Converts raw HTML into markdown content and returns it with the title, description and domain.
+
+    Runs in a worker process, so it only takes and returns plain picklable values.
+    """
+    soup = BeautifulSoup(html_content, "lxml")
+
+    main_content = WebpageScraperTool._extract_main_content(soup)
+    # markdownify is pure Python and scales with the number of nodes, so bound its input
+    if len(main_content) > max_html_chars:
+        main_content = main_content[:max_html_chars]
+    markdown_content = markdownify(
+        main_content,
+        strip=["script", "style"],
+        heading_style="ATX",
+        bullets="-",
+    )
+    markdown_content = WebpageScraperTool._clean_markdown(markdown_content)
+    metadata = WebpageScraperTool._extract_metadata(soup, html_content, url)
+
+    return markdown_content, metadata.title, metadata.description, metadata.domain
@@ -0,0 +1,59 @@
+import asyncio
+from types import SimpleNamespace
+
+from atomic_research_mcp.agents.query_agent import QueryAgentInputSchema, create_query_agent
+from atomic_research_mcp.tools.tavily_search import TavilySearchToolInputSchema
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, messages, **kwargs):
+        self.calls.append(messages)
+        await asyncio.sleep(0)
+        return TavilySearchToolInputSchema(queries=["query"])
+
+    async def create_partial(self, messages, **kwargs):
+        self.calls.append(messages)
+        for queries in (["qu"], ["query"]):
+            await asyncio.sleep(0)
+            yield TavilySearchToolInputSchema(queries=queries)
+
+
+def make_agent(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    agent = create_query_agent()
+    completions = FakeCompletions()
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return agent, completions
+
+
+def test_concurrent_runs_do_not_share_memory(monkeypatch):
+    agent, completions = make_agent(monkeypatch)
+
+    async def run_both():
+        return await asyncio.gather(
+            agent.arun(QueryAgentInputSchema(instruction="first", num_queries=1)),
+            agent.arun(QueryAgentInputSchema(instruction="second", num_queries=1)),
+        )
+
+    asyncio.run(run_both())
+
+    for messages, instruction in zip(completions.calls, ["first", "second"]):
+        user_messages = [message for message in messages if message["role"] == "user"]
+        assert len(user_messages) == 1
+        assert instruction in user_messages[0]["content"]
+    assert agent.memory.get_history() == []
+
+
+def test_arun_stream_yields_partials_without_touching_memory(monkeypatch):
+    agent, completions = make_agent(monkeypatch)
+
+    async def collect():
+        return [partial async for partial in agent.arun_stream(QueryAgentInputSchema(instruction="x", num_queries=1))]
+
+    partials = asyncio.run(collect())
+
+    assert [partial.queries for partial in partials] == [["qu"], ["query"]]
+    assert agent.memory.get_history() == []
@@ -0,0 +1,50 @@
+import numpy as np
+
+from atomic_research_mcp import context_trimmer
+from atomic_research_mcp.context_trimmer import trim_pages
+from atomic_research_mcp.tools.webpage_scraper import WebpageMetadata, WebpageScraperToolOutputSchema
+
+QUESTION = np.array([1, 0], dtype=np.float32)
+
+
+def page(*chunks):
+    return WebpageScraperToolOutputSchema(
+        content="\n\n".join(chunks) + "\n", metadata=WebpageMetadata(title="t", domain="example.com")
+    )
+
+
+def test_keeps_the_most_similar_chunks_of_each_long_page_in_order(monkeypatch):
+    # Each chunk embeds to a unit vector whose similarity to the question is the given score
+    scores = {"a0": 0.1, "a1": 0.9, "a2": 0.2, "a3": 0.8, "a4": 0.3, "c0": 0.7, "c1": 0.1, "c2": 0.6, "c3": 0.95}
+    embedded = []
+
+    def fake_embed_texts(texts):
+        embedded.extend(texts)
+        return np.array([[scores[text], np.sqrt(1 - scores[text] ** 2)] for text in texts])
+
+    monkeypatch.setattr(context_trimmer, "embed_texts", fake_embed_texts)
+    pages = [page("a0", "a1", "a2", "a3", "a4"), page("b0", "b1"), page("c0", "c1", "c2", "c3")]
+
+    trimmed = trim_pages(pages, QUESTION, max_chunks=2)
+
+    assert [p.content for p in trimmed] == ["a1\n\na3\n", "b0\n\nb1\n", "c0\n\nc3\n"]
+    # Short pages are neither embedded nor copied, and the original pages are left untouched
+    assert embedded == ["a0", "a1", "a2", "a3", "a4", "c0", "c1", "c2", "c3"]
+    assert trimmed[1] is pages[1]
+    assert pages[0].content == "a0\n\na1\n\na2\n\na3\n\na4\n"
+
+
+def test_long_chunks_are_cut_off_for_embedding_only(monkeypatch):
+    embedded = []
+
+    def fake_embed_texts(texts):
+        embedded.extend(texts)
+        return np.tile(QUESTION, (len(texts), 1))
+
+    monkeypatch.setattr(context_trimmer, "embed_texts", fake_embed_texts)
+    long_chunk = "x" * (context_trimmer.MAX_EMBEDDED_CHUNK_CHARS + 100)
+
+    trimmed = trim_pages([page(long_chunk, "b", "c")], QUESTION, max_chunks=2)
+
+    assert max(len(text) for text in embedded) == context_trimmer.MAX_EMBEDDED_CHUNK_CHARS
+    assert trimmed[0].content.split("\n\n")[0] == long_chunk
@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+from atomic_research_mcp import embeddings
+from atomic_research_mcp.config import ChatConfig
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.requests = []
+
+    def create(self, model, input):
+        self.requests.append(input)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[len(text), 1.0]) for text in input])
+
+
+def test_batches_are_bounded_by_count_and_total_length(monkeypatch):
+    fake_embeddings = FakeEmbeddings()
+    monkeypatch.setattr(ChatConfig, "openai_client", classmethod(lambda cls: SimpleNamespace(embeddings=fake_embeddings)))
+    texts = ["a", "b", "c", "d" * 8, "e" * 20, "f"]
+
+    vectors = embeddings.embed_texts(texts, batch_size=3, batch_max_chars=10)
+
+    # A text longer than the limit still gets a batch of its own
+    assert fake_embeddings.requests == [["a", "b", "c"], ["d" * 8], ["e" * 20], ["f"]]
+    assert vectors.shape == (6, 2)
+    assert list(vectors[:, 0] > vectors[0, 0]) == [False, False, False, True, True, False]
@@ -0,0 +1,75 @@
+import numpy as np
+
+from atomic_research_mcp.semantic_cache import SemanticCache
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_hit_requires_similar_question_and_same_key(tmp_path):
+    cache = SemanticCache(str(tmp_path / "cache.db"), "model")
+    key = SemanticCache.make_key(num_queries=3)
+    cache.add("q", unit(1, 0, 0), {"answer": "a"}, key)
+
+    assert cache.lookup(unit(0.99, 0.1, 0), key) == {"answer": "a"}
+    assert cache.lookup(unit(0, 1, 0), key) is None
+    assert cache.lookup(unit(1, 0, 0), SemanticCache.make_key(num_queries=5)) is None
+
+
+def test_paraphrased_question_hits(tmp_path):
+    cache = SemanticCache(str(tmp_path / "cache.db"), "model")
+    key = SemanticCache.make_key(num_queries=3, max_chunks_per_page=20)
+    cache.add("What is the capital of France?", unit(1, 0.1, 0), {"answer": "Paris"}, key)
+
+    # A rephrased question embeds close to the original and builds the same key from its parameters
+    assert cache.lookup(unit(1, 0.15, 0.05), SemanticCache.make_key(max_chunks_per_page=20, num_queries=3)) == {
+        "answer": "Paris"
+    }
+    assert cache.lookup(unit(1, 0.15, 0.05), SemanticCache.make_key(num_queries=3, max_chunks_per_page=5)) is None
+
+
+def test_entries_survive_restart_for_same_model_only(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    key = SemanticCache.make_key(num_queries=3)
+    SemanticCache(db_path, "model").add("q", unit(1, 0, 0), {"answer": "a"}, key)
+
+    assert SemanticCache(db_path, "model").lookup(unit(1, 0, 0), key) == {"answer": "a"}
+    assert SemanticCache(db_path, "other-model").lookup(unit(1, 0, 0), key) is None
+
+
+def test_expired_entries_are_not_served_or_loaded(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    key = SemanticCache.make_key(num_queries=3)
+    cache = SemanticCache(db_path, "model", ttl=-1)
+    cache.add("q", unit(1, 0, 0), {"answer": "a"}, key)
+
+    assert cache.lookup(unit(1, 0, 0), key) is None
+    # Loading with the TTL removes expired rows from the database
+    SemanticCache(db_path, "model", ttl=-1)
+    assert SemanticCache(db_path, "model").lookup(unit(1, 0, 0), key) is None
+
+
+def test_oldest_entry_is_evicted_when_full(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    key = SemanticCache.make_key(num_queries=3)
+    cache = SemanticCache(db_path, "model", max_entries=2)
+    for i, vector in enumerate([unit(1, 0, 0), unit(0, 1, 0), unit(0, 0, 1)]):
+        cache.add(f"q{i}", vector, {"answer": i}, key)
+
+    assert cache.lookup(unit(1, 0, 0), key) is None
+    assert cache.lookup(unit(0, 0, 1), key) == {"answer": 2}
+    reloaded = SemanticCache(db_path, "model", max_entries=2)
+    assert reloaded.lookup(unit(1, 0, 0), key) is None
+    assert reloaded.lookup(unit(0, 1, 0), key) == {"answer": 1}
+
+
+def test_zero_max_entries_disables_the_cache(tmp_path):
+    key = SemanticCache.make_key(num_queries=3)
+    for db_path in [str(tmp_path / "cache.db"), ":memory:"]:
+        cache = SemanticCache(db_path, "model", max_entries=0)
+        cache.add("q", unit(1, 0, 0), {"answer": "a"}, key)
+
+        assert not cache.enabled
+        assert cache.lookup(unit(1, 0, 0), key) is None
@@ -0,0 +1,172 @@
+import asyncio
+import gzip
+
+import httpx
+from bs4 import BeautifulSoup
+
+from atomic_research_mcp.tools.webpage_scraper import (
+    WebpageScraperTool,
+    WebpageScraperToolConfig,
+    WebpageScraperToolInputSchema,
+)
+
+PAGE = "<html><head><title>Café</title></head><body><main><p>Hello world</p></main></body></html>".encode()
+
+
+def html_response(request):
+    return httpx.Response(200, headers={"Content-Type": "text/html; charset=utf-8"}, content=PAGE)
+
+
+def scrape(handler, tool=None):
+    tool = tool or WebpageScraperTool()
+    tool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def run():
+        try:
+            return await tool.run_async(WebpageScraperToolInputSchema(url="https://example.com/page"))
+        finally:
+            await tool.aclose()
+
+    try:
+        return asyncio.run(run())
+    finally:
+        tool.shutdown()
+
+
+def scrape_twice(handler, config=WebpageScraperToolConfig()):
+    tool = WebpageScraperTool(config)
+    tool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    params = WebpageScraperToolInputSchema(url="https://example.com/page")
+
+    async def run_twice():
+        try:
+            return await tool.run_async(params), await tool.run_async(params)
+        finally:
+            await tool.aclose()
+
+    try:
+        return asyncio.run(run_twice())
+    finally:
+        tool.shutdown()
+
+
+def test_scrapes_plain_response():
+    output = scrape(html_response)
+
+    assert output.content == "Hello world\n"
+    assert output.metadata.title == "Café"
+
+
+def test_scrapes_gzip_response():
+    output = scrape(
+        lambda request: httpx.Response(
+            200,
+            headers={"Content-Type": "text/html; charset=utf-8", "Content-Encoding": "gzip"},
+            content=gzip.compress(PAGE),
+        )
+    )
+
+    assert output.content == "Hello world\n"
+    assert output.metadata.title == "Café"
+
+
+def test_serves_fresh_pages_from_cache():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return html_response(request)
+
+    first, second = scrape_twice(handler)
+
+    assert second is first
+    assert len(requests) == 1
+
+
+def test_revalidates_stale_pages_with_etag():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"Content-Type": "text/html", "ETag": '"v1"'}, content=PAGE)
+
+    first, second = scrape_twice(handler, WebpageScraperToolConfig(cache_ttl=0))
+
+    assert second is first
+    assert [request.headers.get("If-None-Match") for request in requests] == [None, '"v1"']
+
+
+def test_does_not_cache_error_responses():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(503, headers={"Content-Type": "text/html"}, content=b"<p>Rate limited</p>")
+        return html_response(request)
+
+    first, second = scrape_twice(handler)
+
+    assert first.content == "Rate limited\n"
+    assert second.content == "Hello world\n"
+    assert len(requests) == 2
+
+
+def test_recovers_from_a_dead_parse_worker():
+    tool = WebpageScraperTool(WebpageScraperToolConfig(max_parse_workers=1))
+    tool.warm_up()
+    for process in list(tool._process_pool._processes.values()):
+        process.kill()
+        process.join()
+
+    output = scrape(html_response, tool)
+
+    assert output.content == "Hello world\n"
+
+
+def extract_description(page):
+    return WebpageScraperTool._extract_description(BeautifulSoup(page, "lxml"), page)
+
+
+def test_description_may_contain_angle_brackets():
+    page = '<html><head><meta name="description" content="Price > 5 dollars"></head><body></body></html>'
+
+    assert extract_description(page) == "Price > 5 dollars"
+
+
+def test_description_ignores_commented_out_meta_tags():
+    page = (
+        '<html><head><!-- <meta name="description" content="old"> -->'
+        '<meta name="description" content="new"></head><body></body></html>'
+    )
+
+    assert extract_description(page) == "new"
+
+
+def test_description_is_only_looked_up_in_the_head():
+    page = '<html><head><title>t</title></head><body><meta name="description" content="body"></body></html>'
+
+    assert WebpageScraperTool._extract_description(None, page) is None
+
+
+def test_description_falls_back_to_soup_without_head_end():
+    page = '<title>t</title><meta name="description" content="fragment"><p>text</p>'
+
+    assert extract_description(page) == "fragment"
+
+
+def test_description_ignores_head_end_inside_script():
+    page = (
+        '<html><head><script>document.write("</head>")</script>'
+        '<meta name="description" content="real"></head><body></body></html>'
+    )
+
+    assert extract_description(page) == "real"
+
+
+def test_description_attribute_order_and_entities():
+    page = "<html><head><META content='a &amp; b' NAME=Description></head><body></body></html>"
+
+    assert extract_description(page) == "a & b"